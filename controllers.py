@@ -1,22 +1,25 @@
-import sentry_sdk
+from collections import Counter
 from models import User, UserRole, Client, Contract, Event
-from datetime import datetime
-from sqlalchemy.orm import Session
-from models import User, UserRole
+from sqlalchemy import func, lambda_stmt, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from utils import hash_password
 from session import session
 
 class UserController:
+    # Clés attendues pour chaque utilisateur passé à bulk_create
+    BULK_KEYS = ("username", "email", "password", "role")
+
     def __init__(self, db: Session):
         self.db = db
 
     def _check_permission(self):
         """Vérifie si l'utilisateur connecté est du département MANAGEMENT"""
-        current_user = session.get_current_user_info()
-        if not current_user:
+        role = session.current_role
+        if role is None:
             return False, "Vous devez être connecté."
         
-        if current_user['role'] != "management":
+        if role != "management":
             return False, "Accès refusé. Réservé à l'équipe GESTION."
         
         return True, None
@@ -28,7 +31,7 @@ class UserController:
             return None, message
 
         # 2. Vérifier si l'utilisateur existe déjà
-        if self.db.query(User).filter(User.username == username).first():
+        if self.db.query(self.db.query(User).filter(User.username == username).exists()).scalar():
             return None, f"L'utilisateur '{username}' existe déjà."
 
         # 3. Création
@@ -42,52 +45,128 @@ class UserController:
         self.db.commit()
 
         # --- LOG SENTRY ---
+        import sentry_sdk # Import différé : inutile pour les commandes en lecture
         sentry_sdk.capture_message(f"Nouveau collaborateur créé : {username} ({role})", level="info")
         # ------------------
 
         return new_user, "Utilisateur créé avec succès."
 
+    def bulk_create(self, users):
+        """
+        Crée plusieurs collaborateurs en une seule insertion et un seul commit.
+        users: liste de dicts avec les clés username, email, password, role
+        """
+        authorized, message = self._check_permission()
+        if not authorized:
+            return None, message
+
+        if not users:
+            return None, "Aucun utilisateur à créer."
+
+        # Vérification de chaque entrée avant toute requête
+        roles = {role.value for role in UserRole}
+        for position, user in enumerate(users, start=1):
+            missing = [key for key in self.BULK_KEYS if key not in user]
+            if missing:
+                return None, f"Utilisateur n°{position} : champ(s) manquant(s) : {', '.join(missing)}."
+            if user["role"] not in roles:
+                return None, f"Utilisateur n°{position} : rôle invalide '{user['role']}'."
+
+        usernames = [user["username"] for user in users]
+        emails = [user["email"] for user in users]
+
+        # Doublons à l'intérieur du lot
+        repeated = sorted(
+            value
+            for counts in (Counter(usernames), Counter(emails))
+            for value, count in counts.items() if count > 1
+        )
+        if repeated:
+            return None, f"Ces valeurs apparaissent plusieurs fois dans le lot : {', '.join(repeated)}."
+
+        # Une seule requête pour détecter les doublons en base (username et email sont uniques)
+        existing = self.db.query(User.username, User.email).filter(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        ).all()
+        if existing:
+            batch_usernames = set(usernames)
+            names = ", ".join(
+                row.username if row.username in batch_usernames else row.email for row in existing
+            )
+            return None, f"Ces utilisateurs existent déjà : {names}."
+
+        mappings = [
+            {
+                "username": user["username"],
+                "email": user["email"],
+                "password_hash": hash_password(user["password"]),
+                "role": UserRole(user["role"])
+            }
+            for user in users
+        ]
+        try:
+            self.db.bulk_insert_mappings(User, mappings)
+            self.db.commit()
+        except IntegrityError:
+            # Un autre processus a pu créer un de ces utilisateurs entre-temps
+            self.db.rollback()
+            return None, "Création annulée : un nom d'utilisateur ou un email existe déjà."
+
+        # --- LOG SENTRY ---
+        import sentry_sdk
+        sentry_sdk.capture_message(f"{len(mappings)} collaborateurs créés en lot", level="info")
+        # ------------------
+
+        return len(mappings), f"{len(mappings)} utilisateurs créés avec succès."
+
     def list_users(self):
         # Tout le monde peut voir la liste (lecture seule), pas de restriction stricte ici
         # sauf être connecté
         if not session.get_current_user_info():
              return None, "Vous devez être connecté."
         
-        return self.db.query(User).all(), None
+        # Les lignes sont lues par lots pendant l'affichage plutôt que chargées d'un coup
+        return self.db.query(User).yield_per(500), None
 
     def update_user(self, user_id, **kwargs):
         authorized, message = self._check_permission()
         if not authorized:
             return None, message
 
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return None, "Utilisateur non trouvé."
-
-        # Mise à jour des champs
+        # Champs à modifier (seulement ceux pour lesquels une valeur est fournie)
+        updates = {}
         for key, value in kwargs.items():
-            if value: # Si une valeur est fournie
+            if value:
                 if key == "password":
-                    user.password_hash = hash_password(value)
+                    updates["password_hash"] = hash_password(value)
                 elif key == "role":
-                    user.role = UserRole(value)
+                    updates["role"] = UserRole(value)
                 else:
-                    setattr(user, key, value)
+                    updates[key] = value
+
+        # Un seul UPDATE ... WHERE id = :id, sans SELECT préalable de l'utilisateur
+        if updates:
+            found = self.db.query(User).filter(User.id == user_id).update(updates)
+        else:
+            found = self.db.query(self.db.query(User).filter(User.id == user_id).exists()).scalar()
+        if not found:
+            return None, "Utilisateur non trouvé."
         
         self.db.commit()
 
         # --- LOG SENTRY ---
+        import sentry_sdk
         sentry_sdk.capture_message(f"Collaborateur modifié : ID {user_id}", level="info")
         # ------------------
 
-        return user, "Utilisateur mis à jour."
+        return True, "Utilisateur mis à jour."
 
     def delete_user(self, user_id):
         authorized, message = self._check_permission()
         if not authorized:
             return False, message
 
-        user = self.db.query(User).filter(User.id == user_id).first()
+        user = self.db.get(User, user_id)
         if not user:
             return False, "Utilisateur non trouvé."
 
@@ -104,7 +183,8 @@ class ClientController:
         """Tout le monde peut voir les clients"""
         if not session.get_current_user_info():
              return None, "Vous devez être connecté."
-        return self.db.query(Client).all(), None
+        # Chargement du commercial dans la même requête (évite le N+1 à l'affichage)
+        return self.db.query(Client).options(joinedload(Client.commercial_contact)).yield_per(500), None
 
     def create_client(self, full_name, email, phone, company_name):
         current_user = session.get_current_user_info()
@@ -134,7 +214,7 @@ class ClientController:
             return None, "Seuls les COMMERCIAUX peuvent modifier des clients."
 
         # 2. Récupération du client
-        client = self.db.query(Client).filter(Client.id == client_id).first()
+        client = self.db.get(Client, client_id)
         if not client:
             return None, "Client non trouvé."
 
@@ -147,7 +227,7 @@ class ClientController:
             if value:
                 setattr(client, key, value)
         
-        client.last_contact_date = datetime.now() # Mise à jour auto de la date
+        client.last_contact_date = func.now() # Date calculée par la BDD dans le même UPDATE
         
         self.db.commit()
         return client, "Client mis à jour."
@@ -166,32 +246,29 @@ class ContractController:
         if not session.get_current_user_info():
              return None, "Vous devez être connecté."
         
-        query = self.db.query(Contract)
+        # lambda_stmt : chaque combinaison de filtres n'est compilée en SQL qu'une fois,
+        # les appels suivants réutilisent le SQL mis en cache
+        stmt = lambda_stmt(lambda: select(Contract).options(joinedload(Contract.client)))
 
         # Filtre sur le statut signé/non signé
         if filter_signed is not None:
-            # En BDD on a stocké "true"/"false" en string (selon votre modèle initial)
-            # ou booléen selon l'implémentation. Le modèle a mis String "false".
-            status_str = "true" if filter_signed else "false"
-            query = query.filter(Contract.status == status_str)
+            stmt += lambda s: s.where(Contract.status == filter_signed)
 
         # Filtre sur le paiement (Reste à payer > 0)
         if filter_paid is False:
-            query = query.filter(Contract.remaining_amount > 0)
+            stmt += lambda s: s.where(Contract.remaining_amount > 0)
         elif filter_paid is True:
-            query = query.filter(Contract.remaining_amount == 0)
+            stmt += lambda s: s.where(Contract.remaining_amount == 0)
 
-        return query.all(), None
+        return self.db.execute(stmt, execution_options={"yield_per": 500}).scalars(), None
 
     def create_contract(self, client_id, total_amount, remaining_amount):
-        current_user = session.get_current_user_info()
-        
         # 1. Seule la GESTION peut créer des contrats 
-        if not current_user or current_user['role'] != "management":
+        if session.current_role != "management":
             return None, "Seule l'équipe GESTION peut créer des contrats."
 
         # 2. Vérifier que le client existe
-        client = self.db.query(Client).filter(Client.id == client_id).first()
+        client = self.db.get(Client, client_id)
         if not client:
             return None, "Client introuvable."
 
@@ -199,7 +276,7 @@ class ContractController:
             client_id=client_id,
             total_amount=total_amount,
             remaining_amount=remaining_amount,
-            status="false" # Créé non signé par défaut
+            status=False # Créé non signé par défaut
         )
         
         self.db.add(new_contract)
@@ -211,7 +288,8 @@ class ContractController:
         if not current_user:
             return None, "Connexion requise."
 
-        contract = self.db.query(Contract).filter(Contract.id == contract_id).first()
+        # Le client est chargé avec le contrat (une seule requête pour le contrôle du responsable)
+        contract = self.db.get(Contract, contract_id, options=[joinedload(Contract.client)])
         if not contract:
             return None, "Contrat introuvable."
 
@@ -233,9 +311,9 @@ class ContractController:
         for key, value in kwargs.items():
             if value is not None: 
                 if key == "status": 
-                     value = str(value).lower()
-                     # Si le statut passe à "true" alors qu'il ne l'était pas avant
-                     if value == "true" and contract.status != "true":
+                     value = bool(value)
+                     # Si le contrat passe à signé alors qu'il ne l'était pas avant
+                     if value and not contract.status:
                          contract_was_signed = True
                 setattr(contract, key, value)
         
@@ -244,6 +322,7 @@ class ContractController:
         # --- LOG SENTRY ---
         if contract_was_signed:
             # ATTENTION : Il faut bien 12 espaces avant sentry_sdk ici (3 tabulations)
+            import sentry_sdk
             sentry_sdk.capture_message(f"Contrat {contract_id} SIGNÉ !", level="info")
         # ------------------
 
@@ -259,7 +338,11 @@ class EventController:
         if not current_user:
              return None, "Vous devez être connecté."
         
-        query = self.db.query(Event)
+        # Contrat, client et support chargés en une seule requête
+        query = self.db.query(Event).options(
+            joinedload(Event.contract).joinedload(Contract.client),
+            joinedload(Event.support_contact)
+        )
 
         # Filtre "Pas de support assigné" (Pour la Gestion)
         if filter_no_support:
@@ -269,7 +352,7 @@ class EventController:
         if filter_my_events:
             query = query.filter(Event.support_contact_id == current_user['id'])
 
-        return query.all(), None
+        return query.yield_per(500), None
 
     def create_event(self, contract_id, date_start, date_end, location, attendees, notes):
         current_user = session.get_current_user_info()
@@ -279,10 +362,11 @@ class EventController:
             return None, "Seule l'équipe COMMERCIAL peut créer des événements."
 
         # 2. Vérifier que le contrat existe et est signé
-        contract = self.db.query(Contract).filter(Contract.id == contract_id).first()
+        # Le client est chargé avec le contrat (une seule requête pour le contrôle du responsable)
+        contract = self.db.get(Contract, contract_id, options=[joinedload(Contract.client)])
         if not contract:
             return None, "Contrat introuvable."
-        if contract.status != "true":
+        if not contract.status:
             return None, "Impossible de créer un événement pour un contrat NON SIGNÉ."
         
         # 3. Vérifier que le commercial est bien le responsable du client
@@ -307,7 +391,7 @@ class EventController:
         if not current_user:
             return None, "Connexion requise."
 
-        event = self.db.query(Event).filter(Event.id == event_id).first()
+        event = self.db.get(Event, event_id)
         if not event:
             return None, "Événement introuvable."
 
@@ -1,10 +1,10 @@
-from database import get_db
+from database import SessionLocal
 from models import User, UserRole
 from utils import hash_password
 
 def create_admin():
     # Récupérer une session de base de données
-    db = next(get_db())
+    db = SessionLocal()
     
     print("--- Création de l'utilisateur Administrateur ---")
     username = input("Nom d'utilisateur : ")
@@ -12,8 +12,8 @@ def create_admin():
     password = input("Mot de passe : ")
     
     # Vérifier si l'utilisateur existe déjà
-    existing_user = db.query(User).filter(User.username == username).first()
-    if existing_user:
+    user_exists = db.query(db.query(User).filter(User.username == username).exists()).scalar()
+    if user_exists:
         print("Erreur : Cet utilisateur existe déjà.")
         return
 
@@ -2,7 +2,7 @@
 import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 
 load_dotenv()
@@ -18,8 +18,13 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NA
 # SI vous utilisez MySQL, commentez la ligne du dessus et décommentez celle-ci :
 # DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool de connexions réutilisées (pre_ping écarte les connexions coupées par le serveur)
+engine = create_engine(DATABASE_URL, pool_size=5, pool_pre_ping=True)
+# Une session unique par thread, partagée par tous les contrôleurs d'une commande.
+# expire_on_commit=False évite de recharger les objets après un commit pour les afficher.
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+)
 Base = declarative_base()
 
 def get_db():
@@ -1,41 +1,53 @@
 
 import os
-import sentry_sdk
 from dotenv import load_dotenv
-from rich.table import Table
 import click
 from rich.console import Console
-from database import get_db
+from database import SessionLocal
 from models import User
-from utils import verify_password, create_access_token
+from utils import verify_password, needs_rehash, hash_password, create_access_token
 from session import session
 from controllers import UserController, ClientController, ContractController, EventController # <-- je les ajoutes ici
 
 # Chargement des variables d'environnement
 load_dotenv()
 
-# Initialisation de Sentry
-sentry_sdk.init(
-    dsn=os.getenv("SENTRY_DSN"),
-    # Taux d'échantillonnage des traces (1.0 = capture 100% des transactions pour le débogage)
-    traces_sample_rate=1.0,
-    # Capture les informations locales (variables) pour aider au débogage
-    send_default_pii=True
-)
-
 console = Console()
 
+def init_sentry():
+    """Initialise Sentry (importé seulement si un DSN est configuré)"""
+    dsn = os.getenv("SENTRY_DSN")
+    if not dsn:
+        return
+
+    import sentry_sdk
+    sentry_sdk.init(
+        dsn=dsn,
+        # Taux d'échantillonnage des traces (1.0 = capture 100% des transactions pour le débogage)
+        traces_sample_rate=1.0,
+        # Capture les informations locales (variables) pour aider au débogage
+        send_default_pii=True
+    )
+
 @click.group()
-def cli():
+@click.pass_context
+def cli(ctx):
     """Application CRM Epic Events"""
-    pass
+    # Les commandes locales (sans base de données) n'ont pas besoin du monitoring
+    if ctx.invoked_subcommand not in ("whoami", "logout"):
+        init_sentry()
+
+@cli.result_callback()
+def close_db_session(*args, **kwargs):
+    """Rend la connexion au pool à la fin de chaque commande"""
+    SessionLocal.remove()
 
 @cli.command()
 @click.option("--username", prompt="Nom d'utilisateur", help="Votre nom d'utilisateur")
 @click.option("--password", prompt="Mot de passe", hide_input=True, help="Votre mot de passe")
 def login(username, password):
     """Se connecter à l'application"""
-    db = next(get_db())
+    db = SessionLocal()
     
     # 1. Chercher l'utilisateur dans la BDD
     user = db.query(User).filter(User.username == username).first()
@@ -45,6 +57,11 @@ def login(username, password):
         console.print("[bold red]Erreur : Nom d'utilisateur ou mot de passe incorrect.[/bold red]")
         return
 
+    # Mise à niveau du hash si les paramètres Argon2 ont changé depuis sa création
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+        db.commit()
+
     # 3. Créer le token avec les infos importantes (id, username, role)
     # Note : user.role.value permet de récupérer la chaîne "management" au lieu de l'objet Enum
     access_token = create_access_token(
@@ -81,7 +98,7 @@ def users():
 @users.command("list")
 def list_users():
     """Lister tous les collaborateurs"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = UserController(db)
     users_list, error = controller.list_users()
 
@@ -90,6 +107,7 @@ def list_users():
         return
 
     # Création du tableau avec Rich
+    from rich.table import Table
     table = Table(title="Liste des Collaborateurs")
     table.add_column("ID", style="cyan")
     table.add_column("Username", style="magenta")
@@ -108,7 +126,7 @@ def list_users():
 @click.option("--role", type=click.Choice(['management', 'commercial', 'support'], case_sensitive=False), prompt=True)
 def create_user(username, email, password, role):
     """Créer un nouveau collaborateur"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = UserController(db)
     
     new_user, message = controller.create_user(username, email, password, role)
@@ -126,7 +144,7 @@ def create_user(username, email, password, role):
 @click.option("--password", help="Nouveau mot de passe")
 def update_user(user_id, username, email, role, password):
     """Modifier un collaborateur (via son ID)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = UserController(db)
     
     updated_user, message = controller.update_user(user_id, username=username, email=email, role=role, password=password)
@@ -140,7 +158,7 @@ def update_user(user_id, username, email, role, password):
 @click.argument("user_id", type=int)
 def delete_user(user_id):
     """Supprimer un collaborateur"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = UserController(db)
     
     success, message = controller.delete_user(user_id)
@@ -160,7 +178,7 @@ def clients():
 @clients.command("list")
 def list_clients():
     """Lister tous les clients"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ClientController(db)
     clients_list, error = controller.list_clients()
 
@@ -168,6 +186,7 @@ def list_clients():
         console.print(f"[bold red]{error}[/bold red]")
         return
 
+    from rich.table import Table
     table = Table(title="Liste des Clients")
     table.add_column("ID", style="cyan")
     table.add_column("Nom complet", style="magenta")
@@ -188,7 +207,7 @@ def list_clients():
 @click.option("--company", prompt="Nom de l'entreprise")
 def create_client(full_name, email, phone, company):
     """Créer un client (Commercial uniquement)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ClientController(db)
     
     new_client, message = controller.create_client(full_name, email, phone, company)
@@ -206,7 +225,7 @@ def create_client(full_name, email, phone, company):
 @click.option("--company", help="Nouvelle entreprise")
 def update_client(client_id, full_name, email, phone, company):
     """Mettre à jour un client (Responsable uniquement)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ClientController(db)
     
     updated_client, message = controller.update_client(
@@ -231,7 +250,7 @@ def contracts():
 @click.option("--not-paid", is_flag=True, help="Filtrer les contrats NON PAYÉS (Reste > 0)")
 def list_contracts(signed, not_signed, not_paid):
     """Lister les contrats (Filtres disponibles)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ContractController(db)
     
     # Logique des filtres
@@ -248,6 +267,7 @@ def list_contracts(signed, not_signed, not_paid):
         console.print(f"[bold red]{error}[/bold red]")
         return
 
+    from rich.table import Table
     table = Table(title="Liste des Contrats")
     table.add_column("ID", style="cyan")
     table.add_column("Client", style="magenta")
@@ -258,7 +278,7 @@ def list_contracts(signed, not_signed, not_paid):
     for contract in contracts_list:
         client_name = contract.client.full_name if contract.client else "Inconnu"
         # Affichage propre du statut
-        status_display = "✅ Signé" if contract.status == "true" else "❌ Non signé"
+        status_display = "✅ Signé" if contract.status else "❌ Non signé"
         
         table.add_row(
             str(contract.id), 
@@ -276,7 +296,7 @@ def list_contracts(signed, not_signed, not_paid):
 @click.option("--remaining", type=float, prompt="Montant Restant")
 def create_contract(client_id, amount, remaining):
     """Créer un contrat (Gestion uniquement)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ContractController(db)
     
     new_contract, message = controller.create_contract(client_id, amount, remaining)
@@ -293,7 +313,7 @@ def create_contract(client_id, amount, remaining):
 @click.option("--signed", is_flag=True, help="Marquer comme SIGNÉ")
 def update_contract(contract_id, amount, remaining, signed):
     """Modifier un contrat (Gestion ou Commercial resp.)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = ContractController(db)
     
     # On gère le statut : si le flag --signed est mis, on passe status=True
@@ -319,7 +339,7 @@ def events():
 @click.option("--my-events", is_flag=True, help="Afficher uniquement MES événements (Support)")
 def list_events(no_support, my_events):
     """Lister les événements"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = EventController(db)
     
     events_list, error = controller.list_events(filter_no_support=no_support, filter_my_events=my_events)
@@ -328,6 +348,7 @@ def list_events(no_support, my_events):
         console.print(f"[bold red]{error}[/bold red]")
         return
 
+    from rich.table import Table
     table = Table(title="Liste des Événements")
     table.add_column("ID", style="cyan")
     table.add_column("Contrat ID", style="magenta")
@@ -361,7 +382,7 @@ def list_events(no_support, my_events):
 @click.option("--notes", prompt="Notes", default="")
 def create_event(contract_id, start, end, location, attendees, notes):
     """Créer un événement (Commercial uniquement)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = EventController(db)
     
     new_event, message = controller.create_event(contract_id, start, end, location, attendees, notes)
@@ -379,7 +400,7 @@ def create_event(contract_id, start, end, location, attendees, notes):
 @click.option("--notes", help="Mise à jour des notes")
 def update_event(event_id, support_id, location, attendees, notes):
     """Modifier un événement (Support ou Gestion)"""
-    db = next(get_db())
+    db = SessionLocal()
     controller = EventController(db)
     
     updated_event, message = controller.update_event(
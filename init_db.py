@@ -1,17 +1,49 @@
 # init_db.py
+import hashlib
+import sys
+from sqlalchemy.schema import CreateTable, CreateIndex
 from database import engine, Base
 # Il est impératif d'importer les modèles ici pour que SQLAlchemy les "voie"
 # avant de créer les tables
 from models import User, Client, Contract, Event
 
-def init_db():
+# Empreinte du dernier schéma créé (évite de revérifier chaque table à chaque lancement)
+SCHEMA_LOCK_FILE = "_schema.lock"
+
+def schema_hash():
+    """Calcule une empreinte des tables, colonnes et index définis dans models.py"""
+    # On se base sur le DDL généré pour la base cible : il est identique d'un lancement
+    # à l'autre (contrairement à repr(table), qui contient des adresses mémoire)
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            ddl.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    # L'URL (sans mot de passe) fait partie de l'empreinte : changer de base relance la création
+    url = engine.url.render_as_string(hide_password=True)
+    return hashlib.sha256(repr((url, ddl)).encode()).hexdigest()
+
+def init_db(force=False):
     print("Initialisation de la base de données...")
+
+    current_hash = schema_hash()
+    if not force:
+        try:
+            with open(SCHEMA_LOCK_FILE, "r") as f:
+                if f.read().strip() == current_hash:
+                    print("Schéma inchangé, rien à faire (utilisez --force pour revérifier).")
+                    return
+        except FileNotFoundError:
+            pass
     
     # Cette ligne crée toutes les tables définies dans models.py
     # si elles n'existent pas déjà.
     Base.metadata.create_all(bind=engine)
+
+    with open(SCHEMA_LOCK_FILE, "w") as f:
+        f.write(current_hash)
     
     print("Tables créées avec succès !")
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    init_db(force="--force" in sys.argv)
\ No newline at end of file
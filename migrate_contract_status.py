@@ -0,0 +1,34 @@
+# migrate_contract_status.py
+from sqlalchemy import text
+from database import engine
+
+def migrate_contract_status():
+    print("Migration de la colonne contracts.status...")
+
+    with engine.begin() as conn:
+        # On vérifie le type actuel pour pouvoir relancer le script sans risque
+        data_type = conn.execute(text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = 'contracts' AND column_name = 'status'"
+        )).scalar()
+
+        if data_type is None:
+            print("Table contracts introuvable : lancez d'abord init_db.py.")
+            return
+        if data_type != "boolean":
+            # "true" devient TRUE, tout le reste (dont NULL) devient FALSE
+            conn.execute(text(
+                "ALTER TABLE contracts ALTER COLUMN status TYPE BOOLEAN "
+                "USING COALESCE(status = 'true', FALSE)"
+            ))
+        else:
+            # Colonne déjà booléenne mais encore nullable
+            conn.execute(text("UPDATE contracts SET status = FALSE WHERE status IS NULL"))
+
+        # Un contrat est toujours soit signé, soit non signé
+        conn.execute(text("ALTER TABLE contracts ALTER COLUMN status SET NOT NULL"))
+
+    print("Migration terminée !")
+
+if __name__ == "__main__":
+    migrate_contract_status()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Float, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -35,28 +35,36 @@ class Client(Base):
     last_contact_date = Column(DateTime(timezone=True), server_default=func.now())
 
     # Le client est associé à un commercial [cite: 12]
-    commercial_contact_id = Column(Integer, ForeignKey("users.id"))
+    commercial_contact_id = Column(Integer, ForeignKey("users.id"), index=True)
     commercial_contact = relationship("User", back_populates="clients")
     
     contracts = relationship("Contract", back_populates="client")
 
 class Contract(Base):
     __tablename__ = "contracts"
+    # Index pour les filtres "signé / non signé" et "non payé" de la liste des contrats
+    __table_args__ = (
+        Index("ix_contract_status_remaining", "status", "remaining_amount"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     total_amount = Column(Float, nullable=False)
     remaining_amount = Column(Float, nullable=False)
     creation_date = Column(DateTime(timezone=True), server_default=func.now())
-    status = Column(String, default="false") # "false" pour non signé, "true" pour signé
+    status = Column(Boolean, nullable=False, default=False) # False pour non signé, True pour signé
 
     # Le contrat est lié à un client [cite: 30]
-    client_id = Column(Integer, ForeignKey("clients.id"))
+    client_id = Column(Integer, ForeignKey("clients.id"), index=True)
     client = relationship("Client", back_populates="contracts")
     
     events = relationship("Event", back_populates="contract")
 
 class Event(Base):
     __tablename__ = "events"
+    # Index pour les filtres "sans support" et "mes événements"
+    __table_args__ = (
+        Index("ix_event_support", "support_contact_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     event_date_start = Column(DateTime(timezone=True), nullable=True)
@@ -66,7 +74,7 @@ class Event(Base):
     notes = Column(String, nullable=True)
 
     # L'événement est lié à un contrat [cite: 13]
-    contract_id = Column(Integer, ForeignKey("contracts.id"))
+    contract_id = Column(Integer, ForeignKey("contracts.id"), index=True)
     contract = relationship("Contract", back_populates="events")
 
     # L'événement est assigné à un membre du support [cite: 14]
@@ -5,7 +5,8 @@ afin de prévenir les injections et assurer l'intégrité des données.
 """
 
 import re
-import html
+import string
+from functools import partial
 from typing import Optional, Union
 
 
@@ -19,6 +20,29 @@ class InputSanitizer:
     
     # Caractères dangereux à supprimer ou échapper
     DANGEROUS_CHARS = ['<', '>', '"', "'", '\\', '/', ';', '--', '/*', '*/', 'xp_', 'sp_']
+    # Tous les motifs de DANGEROUS_CHARS en une seule regex (un seul passage sur la chaîne).
+    # '/' couvre déjà '/*' et '*/'. Les préfixes xp/sp placés devant un caractère remplacé
+    # sont absorbés pour qu'aucun 'xp_' ou 'sp_' n'apparaisse après le remplacement.
+    DANGEROUS_PATTERN = re.compile(r"""(?:[xs]p)*(?:[xs]p(?:_|--|[<>"'\\/;])|--|[<>"'\\/;])""", re.IGNORECASE)
+    # Tables str.translate : caractères de contrôle supprimés (tous sauf \t, \n et \r),
+    # et la même chose avec l'échappement HTML de html.escape, le tout en une seule passe
+    CONTROL_CHARS_TABLE = dict.fromkeys(i for i in range(32) if chr(i) not in '\n\r\t')
+    # Caractères pouvant être échappés ou remplacés : sans eux, une chaîne imprimable est déjà propre
+    UNSAFE_CHARS = frozenset('<>"\'\\/;&-_')
+    HTML_ESCAPE_TABLE = {
+        **CONTROL_CHARS_TABLE,
+        ord('&'): '&amp;',
+        ord('<'): '&lt;',
+        ord('>'): '&gt;',
+        ord('"'): '&quot;',
+        ord("'"): '&#x27;',
+    }
+    # Échappement des wildcards SQL LIKE en une seule passe
+    SQL_LIKE_TABLE = str.maketrans({'\\': '\\\\', '%': r'\%', '_': r'\_'})
+    # Classes de caractères pour la complexité des mots de passe ASCII
+    UPPERCASE_CHARS = frozenset(string.ascii_uppercase)
+    LOWERCASE_CHARS = frozenset(string.ascii_lowercase)
+    DIGIT_CHARS = frozenset(string.digits)
     
     @staticmethod
     def sanitize_string(value: str, max_length: int = 255, allow_special: bool = False) -> str:
@@ -42,18 +66,19 @@ class InputSanitizer:
         # Limiter la longueur
         value = value[:max_length]
         
-        # Échapper les caractères HTML si non autorisés
-        if not allow_special:
-            value = html.escape(value)
+        # Cas le plus courant (noms, entreprises...) : rien à échapper ni à remplacer
+        if value.isprintable() and InputSanitizer.UNSAFE_CHARS.isdisjoint(value):
+            return value
         
-        # Supprimer les caractères null et autres caractères de contrôle
-        value = ''.join(char for char in value if ord(char) >= 32 or char in '\n\r\t')
+        # Échapper les caractères HTML si non autorisés, et supprimer les caractères
+        # null et autres caractères de contrôle
+        if not allow_special:
+            value = value.translate(InputSanitizer.HTML_ESCAPE_TABLE)
+        else:
+            value = value.translate(InputSanitizer.CONTROL_CHARS_TABLE)
         
-        # Vérifier les patterns d'injection SQL
-        for dangerous in InputSanitizer.DANGEROUS_CHARS:
-            if dangerous.lower() in value.lower():
-                # Remplacer par des underscores
-                value = re.sub(re.escape(dangerous), '_', value, flags=re.IGNORECASE)
+        # Neutraliser les patterns d'injection SQL (remplacés par des underscores)
+        value = InputSanitizer.DANGEROUS_PATTERN.sub('_', value)
         
         return value
     
@@ -144,9 +169,16 @@ class InputSanitizer:
             return False, "Le mot de passe est trop long (max 128 caractères)."
         
         # Vérifier la complexité
-        has_upper = any(c.isupper() for c in password)
-        has_lower = any(c.islower() for c in password)
-        has_digit = any(c.isdigit() for c in password)
+        if password.isascii():
+            # Cas courant : tests d'appartenance faits en C, sans boucle Python
+            has_upper = not InputSanitizer.UPPERCASE_CHARS.isdisjoint(password)
+            has_lower = not InputSanitizer.LOWERCASE_CHARS.isdisjoint(password)
+            has_digit = not InputSanitizer.DIGIT_CHARS.isdisjoint(password)
+        else:
+            # Caractères accentués (É, é...) : on garde les règles Unicode
+            has_upper = any(c.isupper() for c in password)
+            has_lower = any(c.islower() for c in password)
+            has_digit = any(c.isdigit() for c in password)
         
         if not (has_upper and has_lower and has_digit):
             return False, "Le mot de passe doit contenir au moins une majuscule, une minuscule et un chiffre."
@@ -229,12 +261,58 @@ class InputSanitizer:
         if not value:
             return ""
         
-        # Échapper les wildcards SQL
-        value = value.replace('\\', '\\\\')
-        value = value.replace('%', r'\%')
-        value = value.replace('_', r'\_')
-        
-        return value
+        # Échapper l'antislash et les wildcards SQL
+        return value.translate(InputSanitizer.SQL_LIKE_TABLE)
+
+
+def _sanitize_email(value, **kwargs):
+    is_valid, error = InputSanitizer.validate_email(value)
+    return is_valid, error, value.strip().lower() if is_valid else None
+
+
+def _sanitize_phone(value, **kwargs):
+    is_valid, error = InputSanitizer.validate_phone(value)
+    return is_valid, error, value.strip() if is_valid else None
+
+
+def _sanitize_username(value, **kwargs):
+    is_valid, error = InputSanitizer.validate_username(value)
+    return is_valid, error, value.strip() if is_valid else None
+
+
+def _sanitize_password(value, **kwargs):
+    is_valid, error = InputSanitizer.validate_password(value)
+    return is_valid, error, value if is_valid else None
+
+
+def _sanitize_amount(value, **kwargs):
+    return InputSanitizer.validate_amount(value)
+
+
+def _sanitize_integer(value, min_value=0, max_value=999999, **kwargs):
+    return InputSanitizer.validate_integer(value, min_value, max_value)
+
+
+# Champs entiers aux bornes fixes : validateurs spécialisés créés une fois au chargement
+_sanitize_attendees = partial(_sanitize_integer, min_value=1, max_value=100000)
+
+
+def _sanitize_text(value, max_length=255, allow_special=False, **kwargs):
+    sanitized = InputSanitizer.sanitize_string(value, max_length, allow_special)
+    return True, None, sanitized
+
+
+# Table de dispatch : type de champ -> fonction de validation (un seul accès dict par appel)
+_FIELD_HANDLERS = {
+    "email": _sanitize_email,
+    "phone": _sanitize_phone,
+    "username": _sanitize_username,
+    "password": _sanitize_password,
+    "amount": _sanitize_amount,
+    "integer": _sanitize_integer,
+    "attendees": _sanitize_attendees,
+    "string": _sanitize_text,
+}
 
 
 def sanitize_input(value: str, field_type: str = "string", **kwargs) -> tuple[bool, Optional[str], any]:
@@ -243,40 +321,12 @@ def sanitize_input(value: str, field_type: str = "string", **kwargs) -> tuple[bo
     
     Args:
         value: La valeur à sanitiser
-        field_type: Type de champ (string, email, phone, username, password, amount, integer)
+        field_type: Type de champ (string, email, phone, username, password, amount, integer, attendees)
         **kwargs: Arguments supplémentaires pour la validation
         
     Returns:
         Tuple (est_valide, message_erreur, valeur_sanitisée)
     """
-    sanitizer = InputSanitizer()
-    
-    if field_type == "email":
-        is_valid, error = sanitizer.validate_email(value)
-        return is_valid, error, value.strip().lower() if is_valid else None
-    
-    elif field_type == "phone":
-        is_valid, error = sanitizer.validate_phone(value)
-        return is_valid, error, value.strip() if is_valid else None
-    
-    elif field_type == "username":
-        is_valid, error = sanitizer.validate_username(value)
-        return is_valid, error, value.strip() if is_valid else None
-    
-    elif field_type == "password":
-        is_valid, error = sanitizer.validate_password(value)
-        return is_valid, error, value if is_valid else None
-    
-    elif field_type == "amount":
-        return sanitizer.validate_amount(value)
-    
-    elif field_type == "integer":
-        min_val = kwargs.get('min_value', 0)
-        max_val = kwargs.get('max_value', 999999)
-        return sanitizer.validate_integer(value, min_val, max_val)
-    
-    else:  # string par défaut
-        max_length = kwargs.get('max_length', 255)
-        allow_special = kwargs.get('allow_special', False)
-        sanitized = sanitizer.sanitize_string(value, max_length, allow_special)
-        return True, None, sanitized
+    # string par défaut pour les types inconnus
+    handler = _FIELD_HANDLERS.get(field_type, _sanitize_text)
+    return handler(value, **kwargs)
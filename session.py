@@ -1,24 +1,36 @@
-import json
 import os
+from pathlib import Path
 from utils import decode_token
 
 SESSION_FILE = ".session"
 
 class SessionManager:
+    def __init__(self):
+        # Token lu depuis .session (le fichier n'est lu qu'une fois par processus)
+        self._token = None
+        self._token_loaded = False
+
+    def _set_token(self, token):
+        self._token = token
+        self._token_loaded = True
+
     def save_token(self, token):
         """Sauvegarde le token dans un fichier local .session"""
-        with open(SESSION_FILE, "w") as f:
-            json.dump({"token": token}, f)
+        # Le fichier contient uniquement le token brut (pas de JSON à sérialiser/parser)
+        Path(SESSION_FILE).write_bytes(token.encode("ascii"))
+        self._set_token(token)
 
     def load_token(self):
         """Charge le token depuis le fichier local s'il existe"""
-        if not os.path.exists(SESSION_FILE):
-            return None
+        if not self._token_loaded:
+            self._set_token(self._read_token_file())
+        return self._token
+
+    def _read_token_file(self):
+        """Lit le token stocké dans .session (None si absent ou illisible)"""
         try:
-            with open(SESSION_FILE, "r") as f:
-                data = json.load(f)
-                return data.get("token")
-        except (json.JSONDecodeError, FileNotFoundError):
+            return Path(SESSION_FILE).read_bytes().decode("ascii") or None
+        except (UnicodeDecodeError, FileNotFoundError):
             return None
 
     def get_current_user_info(self):
@@ -28,13 +40,22 @@ class SessionManager:
             return None
         
         # On décode le token pour lire ce qu'il y a dedans (username, role, etc.)
-        payload = decode_token(token)
-        return payload
+        # decode_token garde la signature vérifiée en cache mais revérifie l'expiration à chaque appel
+        return decode_token(token)
+
+    @property
+    def current_role(self):
+        """Rôle de l'utilisateur connecté ("management", "commercial", "support") ou None"""
+        user_info = self.get_current_user_info()
+        return user_info['role'] if user_info else None
 
     def logout(self):
         """Supprime le fichier de session pour déconnecter l'utilisateur"""
-        if os.path.exists(SESSION_FILE):
+        try:
             os.remove(SESSION_FILE)
+        except FileNotFoundError:
+            pass # Déjà déconnecté
+        self._set_token(None)
 
 # On crée une instance unique qu'on pourra importer partout
 session = SessionManager()
\ No newline at end of file
@@ -5,17 +5,28 @@ Ce module teste les mécanismes de sécurité implémentés dans l'application.
 
 import pytest
 import jwt
-from datetime import datetime, timedelta
+import time
 from argon2 import PasswordHasher
 from argon2.exceptions import VerifyMismatchError
 import os
 
 # Définir une SECRET_KEY de test si elle n'existe pas
 os.environ.setdefault('SECRET_KEY', 'test_secret_key_for_testing_only_not_for_production_use')
+# Coût Argon2 réduit pour les tests (les valeurs de production restent les défauts)
+os.environ.setdefault('ARGON2_TIME', '1')
+os.environ.setdefault('ARGON2_MEM_KIB', '8192')
+os.environ.setdefault('ARGON2_PAR', '1')
 
 # Import des modules à tester
-from utils import hash_password, verify_password, create_access_token, decode_token
+from utils import hash_password, verify_password, verify_passwords_bulk, create_access_token, decode_token
 from sanitizer import InputSanitizer, sanitize_input
+from session import SessionManager
+
+
+@pytest.fixture(scope="module")
+def canonical_hash():
+    """Hash de "CorrectPassword123", calculé une seule fois pour les tests de vérification."""
+    return hash_password("CorrectPassword123")
 
 
 class TestPasswordHashing:
@@ -51,20 +62,28 @@ class TestPasswordHashing:
         # Les hashs doivent être différents à cause du salt
         assert hash1 != hash2
     
-    def test_verify_password_correct(self):
+    def test_verify_password_correct(self, canonical_hash):
         """Vérifie que la vérification fonctionne avec le bon mot de passe."""
         password = "CorrectPassword123"
-        hashed = hash_password(password)
         
-        assert verify_password(hashed, password) is True
+        assert verify_password(canonical_hash, password) is True
     
-    def test_verify_password_incorrect(self):
+    def test_verify_password_incorrect(self, canonical_hash):
         """Vérifie que la vérification échoue avec un mauvais mot de passe."""
-        password = "CorrectPassword123"
         wrong_password = "WrongPassword456"
-        hashed = hash_password(password)
         
-        assert verify_password(hashed, wrong_password) is False
+        assert verify_password(canonical_hash, wrong_password) is False
+    
+    def test_verify_passwords_bulk(self, canonical_hash):
+        """Vérifie la vérification en lot : un résultat par couple, dans l'ordre."""
+        pairs = [
+            (canonical_hash, "CorrectPassword123"),
+            (canonical_hash, "WrongPassword456"),
+            (hash_password("Other123"), "Other123"),
+        ]
+        
+        assert verify_passwords_bulk(pairs) == [True, False, True]
+        assert verify_passwords_bulk([]) == []
     
     def test_password_never_stored_plaintext(self):
         """Vérifie qu'on ne peut pas retrouver le mot de passe original."""
@@ -113,15 +132,41 @@ class TestJWTTokens:
         
         # Créer un token déjà expiré
         secret_key = os.getenv("SECRET_KEY", "test_secret_key")
-        expire = datetime.utcnow() - timedelta(hours=1)  # Expiré il y a 1h
         to_encode = data.copy()
-        to_encode.update({"exp": expire})
+        to_encode["exp"] = int(time.time()) - 3600  # Expiré il y a 1h
         expired_token = jwt.encode(to_encode, secret_key, algorithm="HS256")
         
         decoded = decode_token(expired_token)
         
         assert decoded is None
     
+    def test_decode_cached_token_still_checks_expiration(self, monkeypatch):
+        """Vérifie qu'un token déjà décodé (en cache) est refusé une fois expiré."""
+        token = create_access_token({"user_id": 1}, expires_delta=1)
+        decoded = decode_token(token)
+        assert decoded is not None
+        
+        # Modifier le résultat ne doit pas altérer le cache
+        decoded["user_id"] = 2
+        assert decode_token(token)["user_id"] == 1
+        
+        # 2h plus tard, le token mis en cache a expiré
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 2 * 3600)
+        assert decode_token(token) is None
+    
+    def test_session_role_expires_with_token(self, monkeypatch, tmp_path):
+        """Vérifie que le rôle de la session n'est plus accordé une fois le token expiré."""
+        monkeypatch.chdir(tmp_path)  # Le fichier .session est écrit dans un dossier temporaire
+        manager = SessionManager()
+        manager.save_token(create_access_token({"id": 1, "role": "management"}, expires_delta=1))
+        assert manager.current_role == "management"
+        
+        # 2h plus tard, le token a expiré : plus aucun rôle
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 2 * 3600)
+        assert manager.current_role is None
+    
     def test_token_contains_expiration(self):
         """Vérifie que le token contient bien une date d'expiration."""
         data = {"user_id": 1}
@@ -130,14 +175,13 @@ class TestJWTTokens:
         
         assert "exp" in decoded
         exp_timestamp = decoded["exp"]
-        exp_datetime = datetime.utcfromtimestamp(exp_timestamp)
-        now = datetime.utcnow()
+        now = time.time()
         
         # L'expiration doit être dans le futur
-        assert exp_datetime > now
+        assert exp_timestamp > now
         # Et environ 24h dans le futur
-        delta = exp_datetime - now
-        assert 23 <= delta.total_seconds() / 3600 <= 25  # Entre 23 et 25h
+        delta = exp_timestamp - now
+        assert 23 <= delta / 3600 <= 25  # Entre 23 et 25h
 
 
 class TestInputSanitization:
@@ -166,6 +210,21 @@ class TestInputSanitization:
         # Les caractères dangereux doivent être remplacés
         assert "DROP TABLE" not in sanitized or "--" not in sanitized
     
+    def test_sanitize_replaces_dangerous_sequences(self):
+        """Vérifie que les séquences dangereuses sont remplacées, sans tenir compte de la casse."""
+        sanitized = InputSanitizer.sanitize_string("EXEC XP_cmdshell; -- /x", allow_special=True)
+        
+        assert sanitized == "EXEC _cmdshell_ _ _x"
+        # Le remplacement ne doit pas faire apparaître un nouveau motif (sp + '<' -> 'sp_')
+        assert InputSanitizer.sanitize_string("sp<x", allow_special=True) == "_x"
+    
+    def test_sanitize_plain_text_unchanged(self):
+        """Vérifie qu'un texte sans caractère spécial est rendu tel quel (accents compris)."""
+        assert InputSanitizer.sanitize_string("Hélène Dupont Events") == "Hélène Dupont Events"
+        # Un tiret isolé est conservé, un double tiret (commentaire SQL) est remplacé
+        assert InputSanitizer.sanitize_string("Jean-Pierre") == "Jean-Pierre"
+        assert InputSanitizer.sanitize_string("admin--") == "admin_"
+    
     def test_sanitize_max_length(self):
         """Vérifie que la longueur maximale est respectée."""
         value = "A" * 1000
@@ -264,6 +323,15 @@ class TestInputSanitization:
             assert is_valid is False, f"Password devrait être invalide"
             assert error is not None
     
+    def test_validate_password_accented(self):
+        """Vérifie que les lettres accentuées comptent pour la complexité."""
+        is_valid, error = InputSanitizer.validate_password("ÉtéÉtéÉté1")
+        assert is_valid is True
+        assert error is None
+        
+        is_valid, error = InputSanitizer.validate_password("étéétéété1")
+        assert is_valid is False
+    
     def test_validate_amount_valid(self):
         """Vérifie la validation d'un montant valide."""
         valid_amounts = [
@@ -293,6 +361,16 @@ class TestInputSanitization:
             assert error is not None
             assert value is None
     
+    def test_sanitize_input_attendees(self):
+        """Vérifie les bornes du nombre de participants (1 à 100000)."""
+        assert sanitize_input(" 250 ", "attendees") == (True, None, 250)
+        
+        for attendees in ["0", "100001", "beaucoup"]:
+            is_valid, error, value = sanitize_input(attendees, "attendees")
+            assert is_valid is False
+            assert error is not None
+            assert value is None
+    
     def test_sanitize_sql_like(self):
         """Vérifie l'échappement des caractères LIKE SQL."""
         value = "test_%value"
@@ -1,17 +1,30 @@
 import os
 import jwt
-import datetime
-from argon2 import PasswordHasher
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from argon2 import PasswordHasher, Type
 from argon2.exceptions import VerifyMismatchError
 from dotenv import load_dotenv
 
 # Charger les variables secrètes
 load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
+# Clé encodée une seule fois en bytes : PyJWT n'a plus à la convertir à chaque token
+_secret = os.getenv("SECRET_KEY")
+SECRET_KEY = _secret.encode("utf-8") if _secret else None
 ALGORITHM = "HS256"
+# Seul HS256 (HMAC-SHA256) est accepté au décodage : liste construite une seule fois
+ALGORITHMS = [ALGORITHM]
 
-# Initialiser le hacheur de mots de passe Argon2
-ph = PasswordHasher()
+# Initialiser le hacheur de mots de passe Argon2id.
+# Les valeurs par défaut sont celles d'argon2-cffi (3 passes, 64 Mio, 4 threads) ;
+# les variables d'environnement permettent d'alléger le coût (tests, CI) ou de l'augmenter.
+ph = PasswordHasher(
+    time_cost=int(os.getenv("ARGON2_TIME", "3")),
+    memory_cost=int(os.getenv("ARGON2_MEM_KIB", "65536")),
+    parallelism=int(os.getenv("ARGON2_PAR", "4")),
+    type=Type.ID
+)
 
 def hash_password(password: str) -> str:
     """Hache un mot de passe pour le stockage sécurisé."""
@@ -24,24 +37,52 @@ def verify_password(hashed_password: str, plain_password: str) -> bool:
     except VerifyMismatchError:
         return False
 
+def verify_passwords_bulk(pairs: list[tuple[str, str]]) -> list[bool]:
+    """
+    Vérifie plusieurs couples (hash, mot de passe) en parallèle.
+    Argon2 s'exécute en C sans le GIL : les vérifications occupent réellement tous les cœurs.
+    """
+    if not pairs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(pairs), os.cpu_count() or 1)) as executor:
+        return list(executor.map(lambda pair: verify_password(*pair), pairs))
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Indique si le hash a été créé avec d'autres paramètres Argon2 que ceux en vigueur."""
+    return ph.check_needs_rehash(hashed_password)
+
 def create_access_token(data: dict, expires_delta: int = 24) -> str:
     """
     Génère un token JWT (JSON Web Token).
     expires_delta : durée de validité en heures.
     """
     to_encode = data.copy()
-    expire = datetime.datetime.utcnow() + datetime.timedelta(hours=expires_delta)
-    to_encode.update({"exp": expire})
+    # Timestamp POSIX calculé directement (c'est le format stocké dans le token)
+    to_encode["exp"] = int(time.time()) + expires_delta * 3600
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def decode_token(token: str):
-    """Décode et vérifie un token JWT."""
+@lru_cache(maxsize=128)
+def _decode_cached(token: str):
+    """Vérifie la signature d'un token une seule fois par processus."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return jwt.decode(token, SECRET_KEY, algorithms=ALGORITHMS)
     except jwt.ExpiredSignatureError:
         return None # Le token a expiré
     except jwt.InvalidTokenError:
-        return None # Le token est invalide
\ No newline at end of file
+        return None # Le token est invalide
+
+def decode_token(token: str):
+    """Décode et vérifie un token JWT."""
+    payload = _decode_cached(token)
+    if payload is None:
+        return None
+
+    # Un token mis en cache peut avoir expiré depuis : on revérifie "exp" sans refaire le HMAC
+    exp = payload.get("exp")
+    if exp is not None and time.time() >= exp:
+        return None
+
+    # Copie pour que l'appelant ne puisse pas modifier l'entrée du cache
+    return dict(payload)
\ No newline at end of file